@@ -1,11 +1,12 @@
+import copy
 import dataclasses
 import hashlib
-import uuid
-import re
+import os
 from dataclasses import Field, dataclass
+from functools import lru_cache
 from datetime import datetime
 from pathlib import Path
-from typing import Any, List, Self, TextIO, Type, TypeVar, Union, Callable, get_args, get_origin
+from typing import Any, Iterable, List, Self, Sequence, TextIO, Type, TypeVar, Union, Callable, get_args, get_origin
 
 import lxml.etree as ET
 
@@ -46,6 +47,30 @@ class DateValidationError(ValidationError):
         super().__init__(field_path, msg)
 
 
+@lru_cache(maxsize=None)
+def _validation_fields(cls: type) -> tuple[tuple[str, type, bool, bool], ...]:
+    """Return the (name, expected type, listable, optional) of each field of
+    `cls`, as used by Serializable.validate().
+
+    Resolving this from the type hints is comparatively slow, so it is done
+    once per class rather than on every call to validate().
+    """
+    validation_fields = []
+    for field in dataclasses.fields(cls):
+        # check if field is listable based on type hint
+        if get_origin(field.type) is Union:
+            expected_type = get_args(field.type)[0]
+            listable = True
+        else:
+            expected_type = field.type
+            listable = False
+
+        optional_field = field.default is None
+        validation_fields.append((field.name, expected_type, listable, optional_field))
+
+    return tuple(validation_fields)
+
+
 # TODO: update name and docstring to be more descriptive? Now, this class does more than just serialize
 # Or maybe refactor completely?
 class Serializable:
@@ -62,44 +87,41 @@ class Serializable:
         Raises:
             ValidationError: field violates the MDTO schema
         """
-        for field in dataclasses.fields(self):
-            field_name = field.name
+        cls_name = self.__class__.__name__
+        # errors in Informatieobject/Bestand also mention the class and source file
+        _ValidationError = (
+            lambda field_name, msg: ValidationError(
+                [cls_name, field_name], msg, self._srcfile
+            )
+            if cls_name in ["Informatieobject", "Bestand"]
+            else ValidationError([field_name], msg)
+        )
+
+        for field_name, expected_type, listable, optional_field in _validation_fields(
+            type(self)
+        ):
             field_value = getattr(self, field_name)
-            field_type = field.type
-            optional_field = field.default is None
 
             # optional fields may be None
             if optional_field and field_value is None:
                 continue
 
-            cls_name = self.__class__.__name__
-            _ValidationError = (
-                lambda msg: ValidationError([cls_name, field_name], msg, self._srcfile)
-                if cls_name in ["Informatieobject", "Bestand"]
-                else ValidationError([field_name], msg)
-            )
-
-            # check if field is listable based on type hint
-            if get_origin(field_type) is Union:
-                expected_type = get_args(field_type)[0]
-                listable = True
-            else:
-                expected_type = field_type
-                listable = False
-
             if isinstance(field_value, (list, tuple, set)):
                 if not listable:
                     raise _ValidationError(
+                        field_name,
                         f"got type {type(field_value).__name__}, but field does not accept sequences"
                     )
 
                 if not all(isinstance(item, expected_type) for item in field_value):
                     raise _ValidationError(
+                        field_name,
                         f"list items must be {expected_type.__name__}, "
                         f"but found {', '.join(set(type(i).__name__ for i in field_value))}"
                     )
             elif not isinstance(field_value, expected_type):
                 raise _ValidationError(
+                    field_name,
                     f"expected type {expected_type.__name__}, got {type(field_value).__name__}"
                 )
             elif isinstance(field_value, Serializable):
@@ -122,7 +144,7 @@ class Serializable:
                 # (We're actually a little stricter than MDTO on this point)
                 # None is allowed, but only for optional elements (see above)
                 if field_value is None or len(str(field_value)) == 0:
-                    raise _ValidationError("field value must not be empty or None")
+                    raise _ValidationError(field_name, "field value must not be empty or None")
 
     def _mdto_ordered_fields(self) -> tuple[Field]:
         """Sort dataclass fields by their order in the MDTO XSD.
@@ -265,6 +287,8 @@ class IdentificatieGegevens(Serializable):
         Returns:
             IdentificatieGegevens: IdentificatieGegevens containing a UUID4
         """
+        import uuid  # import here for performance
+
         return cls(str(uuid.uuid4()), "UUID4 via mdto.py")
 
 
@@ -313,25 +337,10 @@ class VerwijzingGegevens(Serializable):
         Raises:
             ValueError: If name or code not found
         """
-        tooi_register = register_loader()
-
-        # Check if it's a code and if it's with or without prefix
-        if match := re.fullmatch(rf"({code_prefix})?(\d+)", name_or_code.lower()):
-            code_part = match.group(2)
-            full_code = f"{code_prefix}{code_part}"
-            # get name from code
-            tooi_naam = tooi_register.get(full_code)
-            # always return full code (i.e. code including prefix)
-            tooi_code = full_code if tooi_naam else None
-        # Check if it's a name
-        else:
-            name_key = (name_or_code.lower().removeprefix(name_prefix.lower())).strip()
-            # get code from name_key
-            tooi_code = tooi_register.get(name_key)
-            # get full name from code
-            tooi_naam = tooi_register.get(tooi_code) if tooi_code else None
-
-        if tooi_naam and tooi_code:
+        if tooi_entry := helpers.lookup_tooi_register(
+            name_or_code, register_loader, code_prefix, name_prefix
+        ):
+            tooi_naam, tooi_code = tooi_entry
             return cls(
                 f"{name_prefix} {tooi_naam}",
                 IdentificatieGegevens(tooi_code, register_name),
@@ -568,7 +577,10 @@ class ChecksumGegevens(Serializable):
 
     @classmethod
     def from_file(
-        cls, file_or_filename: str | TextIO, algorithm: str = "sha256"
+        cls,
+        file_or_filename: str | TextIO,
+        algorithm: str = "sha256",
+        checksumDatum: str | None = None,
     ) -> Self:
         """Convience function for creating ChecksumGegegevens objects.
 
@@ -588,12 +600,13 @@ class ChecksumGegevens(Serializable):
             file_or_filename (str | TextIO): file-like object to generate checksum data for
             algorithm (Optional[str]): checksum algorithm to use; defaults to sha256.
              For valid values, see https://docs.python.org/3/library/hashlib.html
+            checksumDatum (Optional[str]): date and time of the checksum, e.g.
+             to give all files in a batch the same `<checksumDatum>`. Defaults to
+             the current date and time.
 
         Returns:
             ChecksumGegevens: checksum metadata for `file_or_filename`
         """
-        infile = helpers.process_file(file_or_filename)
-
         verwijzingBegrippenlijst = VerwijzingGegevens(
             verwijzingNaam="Begrippenlijst ChecksumAlgoritme MDTO"
         )
@@ -602,10 +615,19 @@ class ChecksumGegevens(Serializable):
             begripLabel=algorithm.upper(), begripBegrippenlijst=verwijzingBegrippenlijst
         )
 
-        # file_digest() expects a file in binary mode, hence `infile.buffer.raw`
-        checksumWaarde = hashlib.file_digest(infile.buffer.raw, algorithm).hexdigest()
+        # file_digest() expects a file in binary mode
+        if isinstance(file_or_filename, (str, Path)):
+            # skip process_file(), which would needlessly wrap the file in text mode
+            with open(file_or_filename, "rb", buffering=0) as infile:
+                checksumWaarde = hashlib.file_digest(infile, algorithm).hexdigest()
+        else:
+            infile = helpers.process_file(file_or_filename)
+            # text mode files wrap a binary buffer, binary files can be hashed as-is
+            infile = getattr(infile, "buffer", infile)
+            checksumWaarde = hashlib.file_digest(infile, algorithm).hexdigest()
 
-        checksumDatum = datetime.now().strftime("%Y-%m-%dT%H:%M:%S")
+        if checksumDatum is None:
+            checksumDatum = datetime.now().isoformat(timespec="seconds")
 
         return cls(checksumAlgoritme, checksumWaarde, checksumDatum)
 
@@ -715,10 +737,10 @@ class RaadpleeglocatieGegevens(Serializable):
 
         # listify
         urls = (
-            [self.raadpleeglocatieOnline]
+            (self.raadpleeglocatieOnline,)
             if isinstance(self.raadpleeglocatieOnline, str)
             else self.raadpleeglocatieOnline
-            or []  # handle raadpleeglocatieOnline is None
+            or ()  # handle raadpleeglocatieOnline is None
         )
 
         for u in urls:
@@ -922,7 +944,7 @@ class Object(Serializable):
             Bestand | Informatieobject: A new MDTO object
         """
         # read XML file
-        tree = ET.parse(mdto_xml)
+        tree = ET.parse(mdto_xml, helpers.xml_parser)
         root = tree.getroot()
         children = list(root[0])
 
@@ -1214,34 +1236,152 @@ class Bestand(Object, Serializable):
         else:
             bestandsformaat = helpers.pronominfo(path)
 
+        verwijzing_obj = cls._verwijzing_from_representatie(isRepresentatieVan)
+
         naam = path.name  # set <naam> to basename
-        omvang = path.stat().st_size
-        checksum = ChecksumGegevens.from_file(path)
+        omvang, checksum = cls._omvang_en_checksum(path)
 
-        # file or file path?
-        if isinstance(isRepresentatieVan, (str, Path)) or hasattr(
-            isRepresentatieVan, "read"
-        ):
+        return cls(
+            IdentificatieGegevens.uuid(),
+            naam,
+            omvang,
+            bestandsformaat,
+            checksum,
+            verwijzing_obj,
+        )
+
+    @classmethod
+    def from_files(
+        cls,
+        files: Iterable[str | TextIO],
+        isRepresentatieVan: (
+            VerwijzingGegevens | str | TextIO | Sequence[VerwijzingGegevens | str | TextIO]
+        ),
+        use_mimetype: bool = False,
+    ) -> list[Self]:
+        """Create Bestand objects for multiple files, such as the scanned pages
+        of a letter.
+
+        The result is the same as calling `Bestand.from_file()` on each file, but
+        considerably faster for large numbers of files: PRONOM information is
+        detected in a single batch, and a shared `isRepresentatieVan` is only
+        parsed once.
+
+        Example:
+         ```python
+
+         scans = sorted(Path("brief-1923").glob("*.tif"))
+         bestanden = Bestand.from_files(scans, isRepresentatieVan="brief-1923.mdto.xml")
+
+         for scan, bestand in zip(scans, bestanden):
+             bestand.save(f"{scan}.bestand.mdto.xml")
+         ```
+
+        Args:
+            files (Iterable[str | TextIO]): the files the Bestand objects represent
+            isRepresentatieVan (TextIO | str | VerwijzingGegevens | list): see
+              `Bestand.from_file()`. Pass a list or tuple with one entry per file
+              if the files represent different informatieobjecten.
+            use_mimetype (Optional[bool]): populate `<bestandsformaat>`
+              with mimetype instead of PRONOM info. Defaults to False.
+
+        Raises:
+            ValueError: `isRepresentatieVan` has a different length than `files`
+            RuntimeError: PRONOM or mimetype detection failed for one of the files.
+
+        Returns:
+            list[Bestand]: new Bestand objects, in the same order as `files`
+        """
+        from concurrent.futures import ThreadPoolExecutor  # import here for performance
+
+        paths = [Path(f.name) if hasattr(f, "read") else Path(f) for f in files]
+        if isinstance(isRepresentatieVan, (list, tuple)):
+            if len(isRepresentatieVan) != len(paths):
+                raise ValueError(
+                    f"Got {len(isRepresentatieVan)} isRepresentatieVan values for {len(paths)} files"
+                )
+            representaties = isRepresentatieVan
+        elif isinstance(isRepresentatieVan, (str, Path)):
+            representaties = [isRepresentatieVan] * len(paths)
+        else:
+            # files can only be read once, so resolve them up front
+            verwijzing_obj = cls._verwijzing_from_representatie(isRepresentatieVan)
+            representaties = [copy.deepcopy(verwijzing_obj) for _ in paths]
+        # give each Bestand its own VerwijzingGegevens, like from_file() does;
+        # repeated paths are cheap, as detect_verwijzing() caches its results
+        verwijzing_objs = [
+            cls._verwijzing_from_representatie(r) for r in representaties
+        ]
+        # files checksummed in the same batch share their checksumDatum
+        checksumDatum = datetime.now().isoformat(timespec="seconds")
+
+        with ThreadPoolExecutor() as executor:
+            # hashlib releases the GIL, so files are checksummed concurrently
+            # with each other
+            omvangen_en_checksums = executor.map(
+                lambda path: cls._omvang_en_checksum(path, checksumDatum), paths
+            )
+
+            try:
+                if use_mimetype:
+                    bestandsformaten = [helpers.mimetypeinfo(path) for path in paths]
+                else:
+                    pronom_by_path = helpers.pronominfo_many(paths)
+                    bestandsformaten = [pronom_by_path[str(path)] for path in paths]
+            except BaseException:
+                # don't wait for the remaining checksums if we're failing anyway
+                executor.shutdown(cancel_futures=True)
+                raise
+
+            return [
+                cls(
+                    IdentificatieGegevens.uuid(),
+                    path.name,
+                    omvang,
+                    bestandsformaat,
+                    checksum,
+                    verwijzing_obj,
+                )
+                for path, bestandsformaat, (omvang, checksum), verwijzing_obj in zip(
+                    paths, bestandsformaten, omvangen_en_checksums, verwijzing_objs
+                )
+            ]
+
+    @staticmethod
+    def _omvang_en_checksum(
+        path: Path, checksumDatum: str | None = None
+    ) -> tuple[int, ChecksumGegevens]:
+        """Return the size and checksum of the file at `path`."""
+        # open once, and get the file size from the open file instead of a separate stat()
+        with open(path, "rb", buffering=0) as f:
+            omvang = os.fstat(f.fileno()).st_size
+            checksum = ChecksumGegevens.from_file(f, checksumDatum=checksumDatum)
+
+        return omvang, checksum
+
+    @staticmethod
+    def _verwijzing_from_representatie(
+        isRepresentatieVan: VerwijzingGegevens | str | TextIO,
+    ) -> VerwijzingGegevens:
+        """Convert the isRepresentatieVan argument of from_file() and
+        from_files() to a VerwijzingGegevens object."""
+        # file path? (results are cached by detect_verwijzing)
+        if isinstance(isRepresentatieVan, (str, Path)):
+            return helpers.detect_verwijzing(isRepresentatieVan)
+        # file?
+        elif hasattr(isRepresentatieVan, "read"):
             informatieobject_file = helpers.process_file(isRepresentatieVan)
             # Construct verwijzing from informatieobject file
             verwijzing_obj = helpers.detect_verwijzing(informatieobject_file)
             informatieobject_file.close()
+            return verwijzing_obj
         elif isinstance(isRepresentatieVan, VerwijzingGegevens):
-            verwijzing_obj = isRepresentatieVan
+            return isRepresentatieVan
         else:
             raise TypeError(
                 "isRepresentatieVan must either be a path, file, or a VerwijzingGegevens object."
             )
 
-        return cls(
-            IdentificatieGegevens.uuid(),
-            naam,
-            omvang,
-            bestandsformaat,
-            checksum,
-            verwijzing_obj,
-        )
-
     # this should arguebly be part of .validate() but that would create
     # unnecessary computational costs in some scenarios, e.g. when creating
     # Bestand-objecten yourself.
@@ -1303,38 +1443,45 @@ def _construct_deserialization_classmethods():
     def parse_int(elem: ET.Element) -> int:
         return int(elem.text)
 
-    # measurably faster
+    kenmerk_tag = "{https://www.nationaalarchief.nl/mdto}identificatieKenmerk"
+    bron_tag = "{https://www.nationaalarchief.nl/mdto}identificatieBron"
+
+    # measurably faster than IdentificatieGegevens._from_elem(), which remains
+    # the fallback for elements with missing or out-of-order children
     def parse_identificatie(elem: ET.Element) -> IdentificatieGegevens:
-        return IdentificatieGegevens(
-            elem[0].text,
-            elem[1].text,
-        )
+        if len(elem) == 2:
+            kenmerk, bron = elem
+            if kenmerk.tag == kenmerk_tag and bron.tag == bron_tag:
+                return IdentificatieGegevens(kenmerk.text, bron.text)
+        return IdentificatieGegevens._from_elem(elem)
 
     def from_elem_factory(mdto_xml_parsers: dict) -> classmethod:
         """Create initialized from_elem functions."""
 
+        # absent elements are passed as None
+        missing_args = dict.fromkeys(mdto_xml_parsers)
+
         def from_elem(cls, elem: ET.Element):
             """Convert XML elements (`elem`) to MDTO classes (`cls`)"""
 
-            # it may seem like pre computing this is faster, but it is not
-            constructor_args = {field: [] for field in mdto_xml_parsers}
+            constructor_args = {}
             for child in elem:
+                # keying the parsers by namespaced tag instead is not measurably faster,
+                # since lxml creates (and hashes) a new tag string on every access anyway
                 mdto_field = child.tag.removeprefix(
                     "{https://www.nationaalarchief.nl/mdto}"
                 )
                 parser = mdto_xml_parsers[mdto_field]
-                constructor_args[mdto_field].append(parser(child))
-
-            # cleanup class constructor arguments
-            for argname, value in constructor_args.items():
-                # Replace empty argument lists by None
-                if len(value) == 0:
-                    constructor_args[argname] = None
-                # Replace one-itemed argument lists by their respective item
-                elif len(value) == 1:
-                    constructor_args[argname] = value[0]
-
-            return cls(**constructor_args)
+                value = parser(child)
+                # most elements occur only once, so only build lists for repeated elements
+                if mdto_field not in constructor_args:
+                    constructor_args[mdto_field] = value
+                elif type(prev := constructor_args[mdto_field]) is list:
+                    prev.append(value)
+                else:
+                    constructor_args[mdto_field] = [prev, value]
+
+            return cls(**(missing_args | constructor_args))
 
         return classmethod(from_elem)
 
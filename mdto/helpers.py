@@ -3,14 +3,15 @@
 # enables annotations from mdto.gegevensgroepen without creating a circular import
 from __future__ import annotations
 
+import io
 import logging
 import mimetypes
 import re
 import os
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 from functools import lru_cache
 from pathlib import Path
-from typing import TYPE_CHECKING, TextIO
+from typing import TYPE_CHECKING, Callable, Iterable, TextIO
 
 import lxml.etree as ET
 
@@ -25,18 +26,28 @@ if TYPE_CHECKING:
 # setup logging
 logger = logging.getLogger("mdto.py")
 
-quiet = os.environ.get("MDTO_QUIET")
-if quiet not in ["false", "0"]:
-    logger.addHandler(logging.NullHandler())
-else:
-    handler = logging.StreamHandler()
-    handler.setFormatter(logging.Formatter("%(levelname)s: %(message)s"))
-    logger.addHandler(handler)
-
-    logging.addLevelName(
-        logging.WARNING,
-        "\033[1;33m%s\033[1;0m" % logging.getLevelName(logging.WARNING),
-    )
+
+def _configure_logging() -> None:
+    """Attach mdto.py's handler to `logger`. Does nothing if a handler is
+    already present, e.g. when this module is reloaded."""
+    if logger.handlers:
+        return
+
+    quiet = os.environ.get("MDTO_QUIET")
+    if quiet not in ["false", "0"]:
+        logger.addHandler(logging.NullHandler())
+    else:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(levelname)s: %(message)s"))
+        logger.addHandler(handler)
+
+        logging.addLevelName(
+            logging.WARNING,
+            "\033[1;33m%s\033[1;0m" % logging.getLevelName(logging.WARNING),
+        )
+
+
+_configure_logging()
 
 
 def load_tooi_register(json_filename: str, entity_type: str) -> dict:
@@ -108,6 +119,60 @@ def load_tooi_register_waterschappen() -> dict:
     return load_tooi_register("rwc_waterschappen_compleet_2.json", "Waterschap")
 
 
+# TOOI codes consist of an optional two letter prefix (e.g. 'gm'), followed by digits
+tooi_code_regex = re.compile(r"([a-z]{2})?(\d+)")
+
+@lru_cache(maxsize=1024)
+def lookup_tooi_register(
+    name_or_code: str,
+    register_loader: Callable[[], dict[str, str]],
+    code_prefix: str,
+    name_prefix: str,
+) -> tuple[str, str] | None:
+    """Resolve a name or code to a (naam, code) pair from a TOOI register.
+
+    Results are cached, as callers tend to reference the same few
+    organisations over and over again (e.g. when converting spreadsheets).
+    Only plain strings are cached, since the MDTO objects built from them
+    are mutable.
+
+    Args:
+        name_or_code: Name or code to look up
+        register_loader: Function that loads the register
+        code_prefix: Code prefix (e.g. 'gm', 'pv')
+        name_prefix: Name prefix (e.g. 'Gemeente', 'Provincie')
+
+    Returns:
+        tuple[str, str] | None: official name (without prefix) and full code,
+         or None if `name_or_code` was not found
+    """
+    tooi_register = register_loader()
+    # register keys are lowercase, so canonicalize the input once
+    name_or_code = name_or_code.lower()
+
+    # Check if it's a code and if it's with or without (the right) prefix
+    match = tooi_code_regex.fullmatch(name_or_code)
+    if match and match.group(1) in (None, code_prefix):
+        code_part = match.group(2)
+        full_code = f"{code_prefix}{code_part}"
+        # get name from code
+        tooi_naam = tooi_register.get(full_code)
+        # always return full code (i.e. code including prefix)
+        tooi_code = full_code if tooi_naam else None
+    # Check if it's a name
+    else:
+        name_key = name_or_code.removeprefix(name_prefix.lower()).strip()
+        # get code from name_key
+        tooi_code = tooi_register.get(name_key)
+        # get full name from code
+        tooi_naam = tooi_register.get(tooi_code) if tooi_code else None
+
+    if tooi_naam and tooi_code:
+        return tooi_naam, tooi_code
+
+    return None
+
+
 def process_file(file_or_filename: TextIO | str) -> TextIO:
     """Return file-object if input is already a file.
     Otherwise, assume the argument is a path, and convert
@@ -150,14 +215,72 @@ def pronominfo(file: str | Path) -> BegripGegevens:
           - `begripLabel`: The file's PRONOM signature name
           - `begripCode`: The file's PRONOM ID
           - `begripBegrippenLijst`: A reference to the PRONOM registry
+
+    Note:
+        siegfried's results are cached, as files are commonly identified more
+        than once (e.g. on retries). The cache is invalidated when the file's
+        modification time or size changes. Errors and warnings are still
+        raised and logged on every call.
     """
-    import pygfried  # import here for performance
+    try:
+        st = os.stat(file)
+    except OSError:
+        # let siegfried report what is wrong with the file
+        prinfo = _identify_pronom(str(file))
+    else:
+        prinfo = _identify_pronom_cached(
+            os.path.realpath(file), st.st_mtime_ns, st.st_size
+        )
+
+    return _pronom_begrip(*_pronominfo_from_siegfried(prinfo, file))
 
-    from mdto.gegevensgroepen import BegripGegevens, VerwijzingGegevens
+
+@lru_cache(maxsize=4096)
+def _identify_pronom_cached(path: str, mtime_ns: int, size: int) -> dict:
+    # mtime_ns and size are only part of the cache key
+    return _identify_pronom(path)
+
+
+def _identify_pronom(path: str) -> dict:
+    import pygfried  # import here for performance
 
     # we only care about the first file
-    prinfo = pygfried.identify(str(file), detailed=True)["files"][0]
+    return pygfried.identify(path, detailed=True)["files"][0]
+
+
+def pronominfo_many(files: Iterable[str | Path]) -> dict[str, BegripGegevens]:
+    """Generate PRONOM information about multiple files in one go.
+
+    This is considerably faster than calling `pronominfo()` in a loop when
+    processing many files, as siegfried identifies the files concurrently.
+
+    Args:
+        files (Iterable[str | Path]): Paths to the files to inspect
+
+    Raises:
+        RuntimeError: siegfried failed to detect PRONOM info for one of the files
+
+    Returns:
+        dict[str, BegripGegevens]: mapping of paths (as strings) to the
+         same PRONOM information returned by `pronominfo()`
+    """
+    import pygfried  # import here for performance
 
+    paths = [str(file) for file in files]
+    result = pygfried.identify_many(paths, workers=os.cpu_count() or 1)
+
+    return {
+        prinfo["filename"]: _pronom_begrip(
+            *_pronominfo_from_siegfried(prinfo, prinfo["filename"])
+        )
+        for prinfo in result["files"]
+    }
+
+
+def _pronominfo_from_siegfried(prinfo: dict, file: str | Path) -> tuple[str, str]:
+    """Extract the (format, PRONOM ID) pair from a single file entry of
+    siegfried's results.
+    """
     err = prinfo["errors"]
     if err:
         if "empty" in err:
@@ -174,7 +297,8 @@ def pronominfo(file: str | Path) -> BegripGegevens:
     if len(matches) > 1:
         logger.warning(
             "siegfried returned more than one PRONOM match "
-            f"for {file}. Selecting the first one."
+            "for %s. Selecting the first one.",
+            file,
         )
 
     match = matches[0]
@@ -187,15 +311,29 @@ def pronominfo(file: str | Path) -> BegripGegevens:
     # log siegfried's warnings (such as extension mismatches)
     warning = match["warning"]
     if warning:
-        logger.warning(f"siegfried reports PRONOM warning about {file}: {warning}")
+        logger.warning("siegfried reports PRONOM warning about %s: %s", file, warning)
+
+    return match["format"], match["id"]
+
+
+def _pronom_begrip(begripLabel: str, begripCode: str) -> BegripGegevens:
+    from mdto.gegevensgroepen import BegripGegevens, VerwijzingGegevens
 
     return BegripGegevens(
-        begripLabel=match["format"],
-        begripCode=match["id"],
+        begripLabel=begripLabel,
+        begripCode=begripCode,
         begripBegrippenlijst=VerwijzingGegevens("PRONOM-register"),
     )
 
 
+@lru_cache(maxsize=1)
+def _magic_available() -> bool:
+    # looking up a module spec walks sys.path, so only do this once
+    import importlib.util
+
+    return importlib.util.find_spec("magic") is not None
+
+
 def mimetypeinfo(file: str | Path) -> BegripGegevens:
     """Generate MIME type information about `file`. This information can be used in
     a Bestand's `<bestandsformaat>` tag.
@@ -212,10 +350,9 @@ def mimetypeinfo(file: str | Path) -> BegripGegevens:
           - `begripCode`: The file's MIME type (top-level type + subtype)
           - `begripBegrippenLijst`: A reference to the IANA registry
     """
-    import importlib
     from mdto.gegevensgroepen import BegripGegevens, VerwijzingGegevens
 
-    if importlib.util.find_spec("magic"):
+    if _magic_available():
         import magic
         mimetype = magic.from_file(file, mime=True)
     else:
@@ -233,12 +370,33 @@ def mimetypeinfo(file: str | Path) -> BegripGegevens:
     elif mimetype.endswith("empty"):
         raise RuntimeError(f"{file} appears to be an empty file")
 
-    _, subtype = mimetype.split("/")
+    subtype = mimetype.partition("/")[2]
 
     return BegripGegevens(subtype, VerwijzingGegevens("IANA Media types"), mimetype)
 
 
-def detect_verwijzing(informatieobject: TextIO | str) -> VerwijzingGegevens:
+# parser for reading MDTO XML. MDTO does not use xml:id or entities, and the
+# whitespace between elements is never read, so skip the work of keeping these
+xml_parser = ET.XMLParser(
+    collect_ids=False, resolve_entities=False, remove_blank_text=True
+)
+
+# compiled once, as detect_verwijzing() may be called for every Bestand
+namespaces = {"mdto": "https://www.nationaalarchief.nl/mdto"}
+kenmerk_xpath = ET.XPath(
+    ".//mdto:informatieobject/mdto:identificatie/mdto:identificatieKenmerk",
+    namespaces=namespaces,
+)
+bron_xpath = ET.XPath(
+    ".//mdto:informatieobject/mdto:identificatie/mdto:identificatieBron",
+    namespaces=namespaces,
+)
+naam_xpath = ET.XPath(".//mdto:informatieobject/mdto:naam", namespaces=namespaces)
+
+
+def detect_verwijzing(
+    informatieobject: TextIO | str | ET._Element,
+) -> VerwijzingGegevens:
     """A Bestand object must contain a reference to a corresponding
     informatieobject.  Specifically, it expects an <isRepresentatieVan> tag with
     the following children:
@@ -250,34 +408,139 @@ def detect_verwijzing(informatieobject: TextIO | str) -> VerwijzingGegevens:
     This function infers these so-called 'VerwijzingGegevens' by parsing the XML
     of the file `informatieobject`.
 
+    Note:
+        Results for paths are cached, so that creating many Bestand objects
+        for the same informatieobject parses its XML only once. The cache is
+        invalidated when the file's modification time or size changes.
+
+        Files are parsed incrementally, stopping as soon as <naam> and
+        <identificatie> have been found. This makes large files much faster
+        to process, but adds a little overhead for small ones; pass a path
+        when the same informatieobject is referenced many times.
+
     Args:
-        informatieobject (TextIO | str): XML file to infer VerwijzingGegevens from
+        informatieobject (TextIO | str | ET._Element): XML file to infer
+          VerwijzingGegevens from, or its already parsed root element
 
     Returns:
         VerwijzingGegevens: reference to the informatieobject specified by `informatieobject`
     """
     from mdto.gegevensgroepen import VerwijzingGegevens, IdentificatieGegevens
 
-    id_gegevens = None
-    namespaces = {"mdto": "https://www.nationaalarchief.nl/mdto"}
-    tree = ET.parse(informatieobject)
-    root = tree.getroot()
+    if isinstance(informatieobject, (str, Path)):
+        st = os.stat(informatieobject)
+        found = _detect_verwijzing_path(
+            os.path.realpath(informatieobject), st.st_mtime_ns, st.st_size
+        )
+    elif isinstance(informatieobject, ET._Element):
+        found = _detect_verwijzing_root(informatieobject)
+    elif isinstance(informatieobject, io.TextIOBase) and not hasattr(
+        informatieobject, "buffer"
+    ):
+        # in-memory text (e.g. StringIO) has no binary buffer for iterparse() to
+        # read, and lxml refuses text with an encoding declaration; parse as UTF-8
+        found = _detect_verwijzing_file(
+            io.BytesIO(informatieobject.read().encode()), encoding="utf-8"
+        )
+    else:
+        # text mode files wrap a binary buffer, binary files can be parsed as-is
+        found = _detect_verwijzing_file(
+            getattr(informatieobject, "buffer", informatieobject)
+        )
 
-    id_xpath = ".//mdto:informatieobject/mdto:identificatie/"
+    if isinstance(found, str):
+        source = getattr(informatieobject, "name", informatieobject)
+        raise ValueError(f"Failed to detect {found} in {source}")
 
-    kenmerk = root.find(f"{id_xpath}mdto:identificatieKenmerk", namespaces=namespaces)
-    bron = root.find(f"{id_xpath}mdto:identificatieBron", namespaces=namespaces)
-    naam = root.find(".//mdto:informatieobject/mdto:naam", namespaces=namespaces)
+    naam, kenmerk, bron = found
+    return VerwijzingGegevens(naam, IdentificatieGegevens(kenmerk, bron))
 
-    if None in [kenmerk, bron]:
-        raise ValueError(f"Failed to detect <identificatie> in {informatieobject}")
 
-    if naam is None:
-        raise ValueError(f"Failed to detect <naam> in {informatieobject}")
+@lru_cache(maxsize=128)
+def _detect_verwijzing_path(
+    path: str, mtime_ns: int, size: int
+) -> tuple[str, str, str] | str:
+    # mtime_ns and size are only part of the cache key
+    return _detect_verwijzing_file(path)
 
-    identificatie = IdentificatieGegevens(kenmerk.text, bron.text)
 
-    return VerwijzingGegevens(naam.text, identificatie)
+naam_tag = "{https://www.nationaalarchief.nl/mdto}naam"
+identificatie_tag = "{https://www.nationaalarchief.nl/mdto}identificatie"
+informatieobject_tag = "{https://www.nationaalarchief.nl/mdto}informatieobject"
+kenmerk_tag = "{https://www.nationaalarchief.nl/mdto}identificatieKenmerk"
+bron_tag = "{https://www.nationaalarchief.nl/mdto}identificatieBron"
+
+
+def _detect_verwijzing_file(
+    informatieobject: TextIO | str, encoding: str | None = None
+) -> tuple[str, str, str] | str:
+    """Streaming equivalent of _detect_verwijzing_root().
+
+    <naam> and <identificatie> are the first children of an informatieobject,
+    so parsing can stop early instead of building the tree of the whole file.
+    """
+    if isinstance(informatieobject, str):
+        # iterparse() would open the path itself, and leave it open on early return
+        with open(informatieobject, "rb") as f:
+            return _detect_verwijzing_file(f)
+
+    kenmerk = bron = naam = None
+    for _, elem in ET.iterparse(
+        informatieobject,
+        tag=(kenmerk_tag, bron_tag, naam_tag),
+        encoding=encoding,
+        collect_ids=False,
+        resolve_entities=False,
+        remove_blank_text=True,
+    ):
+        # mirror the XPath expressions: only accept <naam>s and <identificatie>s
+        # of informatieobjecten, which must be below the root (e.g. <MDTO>)
+        parent = elem.getparent()
+        if elem.tag == naam_tag:
+            if naam is None and _is_informatieobject_below_root(parent):
+                naam = elem
+        elif (
+            parent is not None
+            and parent.tag == identificatie_tag
+            and _is_informatieobject_below_root(parent.getparent())
+        ):
+            if elem.tag == kenmerk_tag and kenmerk is None:
+                kenmerk = elem
+            elif elem.tag == bron_tag and bron is None:
+                bron = elem
+
+        if kenmerk is not None and bron is not None and naam is not None:
+            return naam.text, kenmerk.text, bron.text
+
+    return "<naam>" if kenmerk is not None and bron is not None else "<identificatie>"
+
+
+def _is_informatieobject_below_root(elem: ET._Element | None) -> bool:
+    return (
+        elem is not None
+        and elem.tag == informatieobject_tag
+        and elem.getparent() is not None
+    )
+
+
+def _detect_verwijzing_root(root: ET._Element) -> tuple[str, str, str] | str:
+    """Return the (naam, kenmerk, bron) triple of the informatieobject in `root`,
+    or the tag that is missing from it.
+
+    Plain strings are returned instead of VerwijzingGegevens, as the latter are
+    mutable and therefore should not be shared between cached results. Returning
+    (rather than raising) the missing tag lets the caller name its own argument
+    in the error message.
+    """
+    # XPath objects return lists of all matches; we only care about the first
+    kenmerk = kenmerk_xpath(root)
+    bron = bron_xpath(root)
+    naam = naam_xpath(root)
+
+    if not (kenmerk and bron and naam):
+        return "<naam>" if kenmerk and bron else "<identificatie>"
+
+    return naam[0].text, kenmerk[0].text, bron[0].text
 
 
 def valid_url(url: str) -> bool:
@@ -295,28 +558,69 @@ def valid_url(url: str) -> bool:
 
 
 # contains (datefmt, len), in order to ensure precense of zero padded months/days
-date_fmt_precise = [("%Y-%m-%d", 10)]
-date_fmts = date_fmt_precise + [
+date_fmt_precise = (("%Y-%m-%d", 10),)
+date_fmts = date_fmt_precise + (
     ("%Y", 4),
     ("%Y-%m", 7),
-]
-datetime_fmts = date_fmts + [("%Y-%m-%dT%H:%M:%S", 19)]
+)
+datetime_fmts = date_fmts + (("%Y-%m-%dT%H:%M:%S", 19),)
 tz_regex = re.compile(r"(.*?)(Z|[+-]\d{2}:\d{2})?")
+# rough shape of all supported formats; used to reject malformed dates before parsing
+date_layout_regex = re.compile(
+    r"[0-9]{4}(?:-[0-9]{2}(?:-[0-9]{2}(?:T[0-9]{2}:[0-9]{2}:[0-9]{2})?)?)?"
+    r"(?:Z|[+-][0-9]{2}:[0-9]{2})?"
+)
 
-def str_to_datetime(date: str, fmts: list[Tuple] = datetime_fmts) -> datetime:
+def str_to_datetime(date: str, fmts: tuple[tuple] = datetime_fmts) -> datetime:
     """Convert string to datetime object. Assumes `date` is already validated."""
     date, tz = tz_regex.fullmatch(date).groups()
-    tz = tz or ''
 
-    for fmt, fmt_len in fmts:
-        if len(date) == fmt_len:
-            return datetime.strptime(date + tz, f"{fmt}{tz and '%z'}")
+    for _, fmt_len in fmts:
+        if len(date) != fmt_len:
+            continue
+
+        # Constructing datetimes directly is much faster than strptime(), and just
+        # as strict: datetime() range checks each field. fromisoformat() is more
+        # lenient (e.g. it accepts week dates, and ' ' instead of 'T'), hence the
+        # separator checks.
+        if fmt_len == 4:
+            dt = datetime(int(date), 1, 1)
+        elif fmt_len == 7:
+            dt = datetime(int(date[:4]), int(date[5:]), 1)
+        elif date[4] == date[7] == "-" and (
+            fmt_len == 10 or (date[10] == "T" and date[13] == date[16] == ":")
+        ):
+            dt = datetime.fromisoformat(date)
+        else:
+            raise ValueError
+
+        if tz:
+            dt = dt.replace(tzinfo=_str_to_timezone(tz))
+        return dt
 
     raise ValueError
 
 
-def _valid_mdto_date(date: str, fmts: list[tuple]) -> bool:
+def _str_to_timezone(tz: str) -> timezone:
+    """Convert 'Z' or a '[+-]hh:mm' offset to a timezone, like strptime's %z."""
+    if tz == "Z":
+        return timezone.utc
+
+    hours, minutes = int(tz[1:3]), int(tz[4:6])
+    if minutes > 59:
+        raise ValueError
+    offset = timedelta(hours=hours, minutes=minutes)
+    # timezone() itself rejects offsets of 24 hours or more
+    return timezone(-offset if tz[0] == "-" else offset)
+
+
+def _valid_mdto_date(date: str, fmts: tuple[tuple]) -> bool:
     """Generic date checking function; use valid_mdto_datetime or valid_mdto_date"""
+    # raising and catching ValueError is comparatively expensive, so weed out
+    # misformatted dates early
+    if not date_layout_regex.fullmatch(date):
+        return False
+
     try:
         str_to_datetime(date, fmts)
         return True
@@ -333,7 +637,7 @@ def valid_mdto_datetime(date: str) -> bool:
 
 def valid_mdto_datetime_precise(date: str) -> bool:
     """Check if date matches xs:datetime (YYYY-MM-DDThh:mm:ss) exactly."""
-    return _valid_mdto_date(date, [datetime_fmts[-1]])
+    return _valid_mdto_date(date, datetime_fmts[-1:])
 
 
 def valid_mdto_date(date: str) -> bool:
@@ -346,27 +650,27 @@ def valid_mdto_date_precise(date: str) -> bool:
     return _valid_mdto_date(date, date_fmt_precise)
 
 
+# modified from https://github.com/gweis/isodate
+duration_regex = re.compile(
+    r"\+?P"
+    r"(?:\d+(?:[.,]\d+)?Y)?"
+    r"(?:\d+(?:[.,]\d+)?M)?"
+    r"(?:\d+(?:[.,]\d+)?W)?"
+    r"(?:\d+(?:[.,]\d+)?D)?"
+    r"(?:T"
+    r"(?:\d+(?:[.,]\d+)?H)?"
+    r"(?:\d+(?:[.,]\d+)?M)?"
+    r"(?:\d+(?:[.,]\d+)?S)?"
+    r")?"
+)
+
 def valid_duration(duration: str) -> bool:
     """Check if duration is complaint with xs:duration/ISO8601."""
+    return len(duration) > 1 and duration_regex.fullmatch(duration) is not None
 
-    # modified from https://github.com/gweis/isodate
-    return len(duration) > 1 and bool(
-        re.fullmatch(
-            r"\+?P"
-            r"(?:\d+(?:[.,]\d+)?Y)?"
-            r"(?:\d+(?:[.,]\d+)?M)?"
-            r"(?:\d+(?:[.,]\d+)?W)?"
-            r"(?:\d+(?:[.,]\d+)?D)?"
-            r"(?:T"
-            r"(?:\d+(?:[.,]\d+)?H)?"
-            r"(?:\d+(?:[.,]\d+)?M)?"
-            r"(?:\d+(?:[.,]\d+)?S)?"
-            r")?",
-            duration,
-        )
-    )
 
+langcode_regex = re.compile(r"[a-zA-Z]{1,8}(-[a-zA-Z0-9]{1,8})*")
 
 def valid_langcode(langcode: str) -> bool:
     """Check if language code is complaint with xs:language/RFC3066."""
-    return bool(re.fullmatch(r"[a-zA-Z]{1,8}(-[a-zA-Z0-9]{1,8})*", langcode))
+    return bool(langcode_regex.fullmatch(langcode))
@@ -2,6 +2,7 @@ import zipfile
 from io import BytesIO
 from pathlib import Path
 
+import lxml.etree as ET
 import pytest
 import requests
 
@@ -94,7 +95,7 @@ def mdto_example_files(pytestconfig, tmp_path_factory) -> dict:
     return xml_file_paths
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def mdto_xsd(pytestconfig, tmp_path_factory) -> Path:
     """Make (cached) MDTO XSD available as a fixture"""
 
@@ -112,6 +113,13 @@ def mdto_xsd(pytestconfig, tmp_path_factory) -> Path:
     return Path(cache_path) / xsd_filename
 
 
+@pytest.fixture(scope="session")
+def mdto_schema(mdto_xsd) -> ET.XMLSchema:
+    """Make a compiled MDTO XSD available as a fixture. Compiling the XSD is
+    expensive, so this happens only once per test session."""
+    return ET.XMLSchema(ET.parse(mdto_xsd))
+
+
 @pytest.fixture
 def voorbeeld_pdf_file(pytestconfig, tmp_path_factory) -> Path:
     """Make (cached) PDF file available as a fixture. Used to test automatic Bestand generation."""
@@ -183,3 +191,17 @@ def shared_informatieobject():
             dekkingInTijdEinddatum="2005",
         ),
     )
+
+
+@pytest.fixture
+def write_xml():
+    """Write an MDTO object (or its XML) to a file, without validating it first"""
+
+    def write(mdto_object_or_xml, xml_file):
+        xml = mdto_object_or_xml
+        if not isinstance(xml, ET._Element):
+            xml = xml.to_xml()
+        # bypass .save(), which validates
+        ET.ElementTree(xml).write(xml_file, xml_declaration=True)
+
+    return write
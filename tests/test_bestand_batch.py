@@ -0,0 +1,118 @@
+from datetime import datetime
+
+import pytest
+
+import mdto.classes
+
+from mdto.gegevensgroepen import *
+from mdto.helpers import pronominfo, pronominfo_many
+
+
+@pytest.fixture
+def batch_files(shared_informatieobject, tmp_path, write_xml):
+    """An informatieobject, and a few files that represent it"""
+    xml_file = tmp_path / "informatieobject.xml"
+    write_xml(shared_informatieobject, xml_file)
+
+    files = []
+    for i in range(5):
+        file = tmp_path / f"scan-{i}.txt"
+        file.write_text(f"pagina {i}\n" * (i + 1))
+        files.append(file)
+
+    return xml_file, files
+
+
+def assert_same_bestand(got, expected):
+    """Compare two Bestand objects, ignoring their (random) identificatie"""
+    assert got.identificatie != expected.identificatie
+    got.identificatie = expected.identificatie
+    # the two may be created in different seconds
+    got.checksum.checksumDatum = expected.checksum.checksumDatum
+    assert got == expected
+
+
+@pytest.mark.parametrize("use_mimetype", [False, True])
+def test_from_files(batch_files, use_mimetype):
+    """Test that Bestand.from_files() matches Bestand.from_file(), in input order"""
+    xml_file, files = batch_files
+
+    bestanden = Bestand.from_files(files, xml_file, use_mimetype=use_mimetype)
+
+    assert [bestand.naam for bestand in bestanden] == [file.name for file in files]
+    for file, bestand in zip(files, bestanden):
+        assert_same_bestand(
+            bestand, Bestand.from_file(file, xml_file, use_mimetype=use_mimetype)
+        )
+
+
+def test_from_files_per_file_verwijzing(batch_files, shared_informatieobject):
+    """Test passing one isRepresentatieVan per file"""
+    xml_file, files = batch_files
+    other = VerwijzingGegevens("Ander informatieobject")
+
+    bestanden = Bestand.from_files(files[:2], [xml_file, other])
+    assert bestanden[0].isRepresentatieVan.verwijzingNaam == shared_informatieobject.naam
+    assert bestanden[1].isRepresentatieVan == other
+
+    with pytest.raises(ValueError):
+        Bestand.from_files(files, [xml_file])
+
+
+def test_from_files_independent_verwijzing(batch_files):
+    """Test that Bestand objects from one batch don't share their isRepresentatieVan"""
+    xml_file, files = batch_files
+
+    for isRepresentatieVan in (xml_file, VerwijzingGegevens("Ander informatieobject")):
+        bestanden = Bestand.from_files(files[:2], isRepresentatieVan)
+        assert bestanden[0].isRepresentatieVan == bestanden[1].isRepresentatieVan
+        bestanden[0].isRepresentatieVan.verwijzingNaam = "changed by caller"
+        assert bestanden[1].isRepresentatieVan.verwijzingNaam != "changed by caller"
+
+
+def test_from_files_missing(batch_files, tmp_path):
+    """Test that missing files raise a FileNotFoundError"""
+    xml_file, files = batch_files
+
+    with pytest.raises(FileNotFoundError):
+        Bestand.from_files(files + [tmp_path / "missing.txt"], xml_file)
+
+
+def test_pronominfo_many(batch_files):
+    """Test that pronominfo_many() matches pronominfo()"""
+    xml_file, files = batch_files
+    files = [xml_file] + files
+
+    got = pronominfo_many(files)
+
+    assert set(got) == {str(file) for file in files}
+    for file in files:
+        assert got[str(file)] == pronominfo(file)
+
+
+def test_pinned_checksumDatum(batch_files):
+    """Test that a given checksumDatum is used as-is"""
+    _, files = batch_files
+
+    with open(files[0], "rb") as f:
+        checksum = ChecksumGegevens.from_file(f, checksumDatum="2001-02-03T04:05:06")
+    assert checksum.checksumDatum == "2001-02-03T04:05:06"
+
+
+def test_from_files_shared_checksumDatum(batch_files, monkeypatch):
+    """Test that all Bestand objects in a batch share their checksumDatum"""
+    xml_file, files = batch_files
+
+    # make every call to now() return a different second
+    class FakeDatetime(datetime):
+        calls = 0
+
+        @classmethod
+        def now(cls, tz=None):
+            cls.calls += 1
+            return datetime(2001, 2, 3, 4, 5, cls.calls % 60, tzinfo=tz)
+
+    monkeypatch.setattr(mdto.classes, "datetime", FakeDatetime)
+
+    bestanden = Bestand.from_files(files, xml_file)
+    assert len({bestand.checksum.checksumDatum for bestand in bestanden}) == 1
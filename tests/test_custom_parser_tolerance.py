@@ -26,3 +26,44 @@ def test_missing_but_required_tolerance(voorbeeld_archiefstuk_xml):
     archiefstuk = Informatieobject._from_elem(children)
     assert archiefstuk.naam is None
     assert archiefstuk.taal == "nl"
+
+
+def test_out_of_order_identificatie_tolerance(shared_informatieobject):
+    """Test parser tolerance on out of order children of <identificatie>"""
+    children = list(shared_informatieobject.to_xml()[0])
+    identificatie = children[0]
+    # swap identificatieKenmerk and identificatieBron
+    identificatie[0].addprevious(identificatie[1])
+
+    informatieobject = Informatieobject._from_elem(children)
+    assert informatieobject.identificatie == IdentificatieGegevens(
+        "abcd-1234", "Corsa (Geldermalsen)"
+    )
+
+
+@pytest.mark.parametrize("swap", [False, True])
+def test_identificatie_from_file(
+    shared_informatieobject, tmp_path, write_xml, monkeypatch, swap
+):
+    """Test parsing namespaced <identificatie>s from disk, both in and out of order"""
+    xml = shared_informatieobject.to_xml()
+    if swap:
+        identificatie = xml[0][0]
+        identificatie[0].addprevious(identificatie[1])
+    xml_file = tmp_path / "informatieobject.xml"
+    write_xml(xml, xml_file)
+
+    # in order <identificatie>s are parsed without the generic parser
+    calls = []
+    from_elem = IdentificatieGegevens._from_elem.__func__
+    monkeypatch.setattr(
+        IdentificatieGegevens,
+        "_from_elem",
+        classmethod(lambda cls, elem: calls.append(elem) or from_elem(cls, elem)),
+    )
+
+    informatieobject = Informatieobject.open(xml_file)
+    assert informatieobject.identificatie == IdentificatieGegevens(
+        "abcd-1234", "Corsa (Geldermalsen)"
+    )
+    assert len(calls) == swap
@@ -14,6 +14,17 @@ def test_pronom_siegfried(voorbeeld_archiefstuk_xml):
     assert expected == got
 
 
+def test_pronom_cached_warnings(tmp_path, caplog):
+    """Test that cached PRONOM results still warn on every call, about the given path"""
+    xml_file = tmp_path / "mismatch.txt"
+    xml_file.write_text('<?xml version="1.0"?>\n<a/>\n')
+
+    for file in (xml_file, f"{tmp_path}/./mismatch.txt"):
+        caplog.clear()
+        assert pronominfo(file).begripCode == "fmt/101"
+        assert f"{file}: extension mismatch" in caplog.text
+
+
 def test_mimetype(voorbeeld_pdf_file):
     """Test mimetype detection"""
     expected = BegripGegevens(
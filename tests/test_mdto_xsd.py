@@ -6,11 +6,8 @@ import pytest
 from mdto.gegevensgroepen import *
 
 
-def test_informatieobject_xml_validity(mdto_xsd, shared_informatieobject):
+def test_informatieobject_xml_validity(mdto_schema, shared_informatieobject):
     """Test if running to_xml() on a informatieobject procudes valid MDTO XML"""
-    # create a schema object from the MDTO XSD
-    mdto_schema = ET.XMLSchema(ET.parse(mdto_xsd))
-
     # lxml is silly, and does not bind namespaces to nodes until _after_ they've been serialized.
     # See: https://stackoverflow.com/questions/22535284/strange-lxml-behavior
     # As a workaround, we serialize the ElemenTree object to a string, and then deserialize this
@@ -23,11 +20,8 @@ def test_informatieobject_xml_validity(mdto_xsd, shared_informatieobject):
     assert mdto_schema.validate(informatieobject_xml)
 
 
-def test_automatic_bestand_xml_validity(mdto_xsd, voorbeeld_archiefstuk_xml):
+def test_automatic_bestand_xml_validity(mdto_schema, voorbeeld_archiefstuk_xml):
     """Test if running to_xml() on a automatically generated Bestand procudes valid MDTO XML"""
-    # create a schema object from the MDTO XSD
-    mdto_schema = ET.XMLSchema(ET.parse(mdto_xsd))
-
     # use this .py file for automatic metadata generation
     example_file = Path(__file__)
     # create Bestand object from example_file + existing informatieobject
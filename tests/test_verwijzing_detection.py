@@ -0,0 +1,100 @@
+import io
+
+import pytest
+import lxml.etree as ET
+
+from mdto.gegevensgroepen import *
+from mdto.helpers import detect_verwijzing
+
+
+def test_detect_verwijzing(shared_informatieobject, tmp_path, write_xml):
+    """Test detecting a verwijzing from a path, file, and parsed element"""
+    xml_file = tmp_path / "informatieobject.xml"
+    write_xml(shared_informatieobject, xml_file)
+
+    expected = VerwijzingGegevens(
+        "Verlenen kapvergunning",
+        IdentificatieGegevens("abcd-1234", "Corsa (Geldermalsen)"),
+    )
+
+    assert detect_verwijzing(xml_file) == expected
+    assert detect_verwijzing(str(xml_file)) == expected
+    with open(xml_file) as f:
+        assert detect_verwijzing(f) == expected
+    with open(xml_file, "rb") as f:
+        assert detect_verwijzing(f) == expected
+    assert detect_verwijzing(ET.parse(xml_file).getroot()) == expected
+
+
+def detect_verwijzing_all_inputs(xml_file):
+    """Run detect_verwijzing() on `xml_file` passed as every supported input type"""
+    results = []
+    for informatieobject in (
+        lambda: xml_file,
+        lambda: open(xml_file),
+        lambda: open(xml_file, "rb"),
+        lambda: io.StringIO(xml_file.read_text()),
+        lambda: ET.parse(xml_file).getroot(),
+    ):
+        informatieobject = informatieobject()
+        try:
+            results.append(detect_verwijzing(informatieobject))
+        except ValueError:
+            results.append(ValueError)
+        finally:
+            if hasattr(informatieobject, "close"):
+                informatieobject.close()
+    return results
+
+
+@pytest.mark.parametrize("xml_declaration", [False, True])
+@pytest.mark.parametrize("as_root", [False, True])
+def test_detect_verwijzing_input_types(
+    shared_informatieobject, tmp_path, as_root, xml_declaration
+):
+    """Test that all input types agree, including for an <informatieobject> root"""
+    xml_file = tmp_path / "informatieobject.xml"
+    xml = shared_informatieobject.to_xml()
+    if as_root:
+        # reparse, so the extracted <informatieobject> keeps its namespace
+        xml = ET.fromstring(ET.tostring(xml))[0]
+    ET.ElementTree(xml).write(xml_file, xml_declaration=xml_declaration)
+
+    results = detect_verwijzing_all_inputs(xml_file)
+    assert results == [ValueError if as_root else results[0]] * len(results)
+    assert as_root or results[0] != ValueError
+
+
+def test_detect_verwijzing_cache(shared_informatieobject, tmp_path, write_xml):
+    """Test that cached verwijzingen are not shared, and are refreshed when the file changes"""
+    xml_file = tmp_path / "informatieobject.xml"
+    write_xml(shared_informatieobject, xml_file)
+
+    verwijzing = detect_verwijzing(xml_file)
+    verwijzing.verwijzingNaam = "changed by caller"
+    assert detect_verwijzing(xml_file).verwijzingNaam == "Verlenen kapvergunning"
+
+    shared_informatieobject.naam = "Verlenen omgevingsvergunning"
+    write_xml(shared_informatieobject, xml_file)
+    assert detect_verwijzing(xml_file).verwijzingNaam == "Verlenen omgevingsvergunning"
+
+
+def test_detect_verwijzing_missing(tmp_path):
+    """Test that files without an informatieobject raise a ValueError"""
+    xml_file = tmp_path / "naam.xml"
+    xml_file.write_text('<naam xmlns="https://www.nationaalarchief.nl/mdto">x</naam>')
+
+    with pytest.raises(ValueError, match="<identificatie>"):
+        detect_verwijzing(xml_file)
+
+
+def test_detect_verwijzing_error_path(tmp_path, monkeypatch):
+    """Test that errors mention the path as given, not its absolute path"""
+    (tmp_path / "naam.xml").write_text(
+        '<naam xmlns="https://www.nationaalarchief.nl/mdto">x</naam>'
+    )
+    monkeypatch.chdir(tmp_path)
+
+    with pytest.raises(ValueError) as excinfo:
+        detect_verwijzing("naam.xml")
+    assert str(excinfo.value) == "Failed to detect <identificatie> in naam.xml"